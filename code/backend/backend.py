@@ -8,11 +8,15 @@ Authors: Jason Duong, Yahya Asmara, Abdulrahman Negmeldin
 """
 Used in the context of Render. Allows this file to connect to the database via a URL and allows it to access a secret key.
 """
+import io
 import os
 import re
 import math
-from itertools import combinations
-from functools import wraps
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import combinations, count
+from functools import lru_cache, wraps
+from contextlib import contextmanager
 from typing import Optional, Mapping
 
 """
@@ -21,7 +25,7 @@ Imports create_engine as the main entry point into the DB
 Imports text to safely inject SQL code into the database
 """
 from sqlalchemy import create_engine, text
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import DBAPIError, SQLAlchemyError
 
 """
 Import the Flask framework so it can be used.
@@ -30,9 +34,23 @@ Import jsonify so communications to the front-end are in the form of JSON.
 - JSON is used as this uses the REST standard and JSON is commonly used.
 Import session so that flask can manage sessions.
 """
-from flask import Flask, request, jsonify, g
+from flask import Flask, Response, request, jsonify, g
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 
+"""
+Import orjson to serialize responses, much faster than the standard json module on large listings
+"""
+import orjson
+
+"""
+Import psycopg2 so errors from raw cursors can be wrapped in SQLAlchemy's exception types
+Import execute_values to send multi-row INSERTs in a single round-trip
+Import RealDictCursor so hot read paths get plain dicts straight from the driver
+"""
+import psycopg2
+from psycopg2.extras import RealDictCursor, execute_values
+
 """
 Import bcrypt to hash passwords.
 """
@@ -41,8 +59,10 @@ import bcrypt
 
 """
 Import datetime used for saving registration date of users
+All timestamps are timezone-aware UTC
 """
 from datetime import datetime, timedelta, timezone
+_UTC = timezone.utc
 
 """
 Import jwt used for authentication
@@ -57,7 +77,8 @@ jwt_expire_minutes = 60 * 2  # 2 hour token
 Used for A* 
 """
 import heapq
-from collections import defaultdict
+from collections import OrderedDict
+from operator import sub
 
 """
 Gets the database URL from Render's environmental variable named DATABASE_URL (configured in the Render website).
@@ -93,6 +114,69 @@ LOCATION_TYPE_ACCESS = {
 
 LANDMARK_CATEGORIES = {"Mountain", "River", "Lake", "In_City", "Other"}
 
+"""
+Secondary indexes backing the owner filters and joins used by the API.
+Created with IF NOT EXISTS so databases configured before they were added pick them up at startup.
+"""
+SCHEMA_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS cell_createdby_idx ON CELL(createdBy)",
+    "CREATE INDEX IF NOT EXISTS connects_to_location_idx ON CONNECTS_TO(locationID)",
+    "CREATE INDEX IF NOT EXISTS vehicle_ownedby_idx ON VEHICLE(ownedBy)",
+    "CREATE INDEX IF NOT EXISTS travel_route_vehicle_idx ON TRAVEL_ROUTE(vehicleID)",
+    "CREATE INDEX IF NOT EXISTS road_blocked_idx ON ROAD(roadID) WHERE roadType = 'blocked'",
+    "CREATE INDEX IF NOT EXISTS cell_coordinate_gix ON CELL USING GIST(coordinate)",
+    "CREATE INDEX IF NOT EXISTS travel_route_start_gix ON TRAVEL_ROUTE USING GIST(startCellCoord)",
+    "CREATE INDEX IF NOT EXISTS travel_route_end_gix ON TRAVEL_ROUTE USING GIST(endCellCoord)",
+    # fails while duplicate routes remain (logged below), run code/database/dedupe_travel_routes.py once to clear them
+    """
+    CREATE UNIQUE INDEX IF NOT EXISTS travel_route_dedupe_idx ON TRAVEL_ROUTE(
+        vehicleID, modeOfTransportID,
+        (startCellCoord[0]), (startCellCoord[1]), (endCellCoord[0]), (endCellCoord[1]),
+        travelTime, totalDistance, totalCost
+    )
+    """,
+]
+
+"""
+Single-row snapshot of the admin dashboard totals.
+The unique index on totals_key is what allows REFRESH ... CONCURRENTLY.
+"""
+ADMIN_TOTALS_VIEW = """
+CREATE MATERIALIZED VIEW IF NOT EXISTS admin_totals AS
+    SELECT
+        1 AS totals_key,
+        (SELECT COUNT(*) FROM USERS) AS total_users,
+        cells.total_locations,
+        (SELECT COUNT(*) FROM TRAVEL_ROUTE) AS total_routes,
+        (SELECT COUNT(*) FROM ROAD WHERE roadType = 'blocked') AS blocked_roads,
+        cells.pending_requests,
+        now() AS refreshed_at
+    FROM (
+        -- one pass over CELL for both location counts
+        SELECT
+            COUNT(*) AS total_locations,
+            COUNT(*) FILTER (WHERE NOT info.isPublic) AS pending_requests
+        FROM CELL c
+        LEFT JOIN CELL_TYPE_INFO info ON info.locationType = c.locationType
+    ) cells
+"""
+ADMIN_TOTALS_MAX_AGE = timedelta(seconds=60)  # overview refreshes the snapshot once it is older than this
+
+"""
+Binary export of the ROAD table for /admin/roads (Accept: application/octet-stream)
+Rows are PGCOPY binary: roadID int4, x1 y1 x2 y2 float8, distance int4, roadType text
+"""
+ADMIN_ROADS_COPY = """
+COPY (
+    SELECT roadID, (roadSegment[0])[0], (roadSegment[0])[1], (roadSegment[1])[0], (roadSegment[1])[1],
+           distance, roadType
+    FROM ROAD
+    ORDER BY roadID
+) TO STDOUT (FORMAT binary)
+"""
+
+STREAM_YIELD_PER = 500  # rows fetched per round-trip when streaming large result sets
+
 DEFAULT_CURRENCY_REFERENCE = [
     {"currencyName": "Solari", "currencySymbol": "SOL", "baseRate": 1.0},
     {"currencyName": "Lumen", "currencySymbol": "LMN", "baseRate": 1.35},
@@ -116,9 +200,23 @@ VEHICLE_REFERENCE_LOOKUP = {entry["vehicleName"]: entry for entry in DEFAULT_VEH
 Create a Flask instance of the current file.
 __name__ denotes the current file, value varies by whether this file is imported or ran directly.
 """
+"""
+JSON provider backed by orjson
+datetime values are written as ISO 8601 with a trailing Z for UTC, anything orjson cannot handle natively (e.g. Decimal) falls back to Flask's default
+"""
+class OrjsonProvider(DefaultJSONProvider):
+    options = orjson.OPT_UTC_Z | orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self.options).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 webApp = Flask(__name__)
+webApp.json = OrjsonProvider(webApp)
 webApp.secret_key = SECRET_KEY # Sets the secret key for flask to the one stored on Render
-CORS(webApp, resources={r"/*": {"origins": "*"}})
+CORS(webApp, resources={r"/*": {"origins": "*"}}, expose_headers=["X-Next-Cursor"])
 
 
 #--Authentication API--
@@ -127,16 +225,18 @@ Helper function to hash passwords for security purposes
 
 # ==== Authentication helpers and session utilities ====
 """
-def hash_password(pwd):
+def hash_password(pwd: str) -> str:
     salt = bcrypt.gensalt()
     hashed = bcrypt.hashpw(pwd.encode('utf-8'), salt)
-    return hashed.decode('utf-8')
+    return hashed.decode('ascii')  # stored in the TEXT column USERS.userPassword
 
 """
 Helper function to verify a stored password against one provided by the user
+bcrypt works on bytes, so the stored hash is only encoded when it arrives as text
 """
-def verify_password(stored_pwd, provided_pwd):
-    stored_pwd = stored_pwd.encode("utf-8")
+def verify_password(stored_pwd: bytes | str, provided_pwd: str) -> bool:
+    if isinstance(stored_pwd, str):
+        stored_pwd = stored_pwd.encode("ascii")  # bcrypt hashes are plain ASCII
 
     return bcrypt.checkpw(provided_pwd.encode("utf-8"), stored_pwd)
 
@@ -147,7 +247,7 @@ def create_access_token(userID: int, role: str) -> str:
     if not SECRET_KEY:
         raise RuntimeError("SECRET_KEY is not set")
 
-    now = datetime.now(timezone.utc)
+    now = datetime.now(_UTC)
     payload = {
         "sub": str(userID),  # subject
         "iat": int(now.timestamp()),
@@ -173,6 +273,129 @@ Basic helper function used to connect to the database
 def get_db_connection():
     return db_engine.connect()
 
+"""
+Re-raise psycopg2 errors from raw cursor work as the matching SQLAlchemy exception (IntegrityError, OperationalError, ...)
+Route handlers only catch SQLAlchemyError, so without this a driver error would escape as an HTML 500
+"""
+@contextmanager
+def translate_db_errors(sql: str, params=None):
+    try:
+        yield
+    except psycopg2.Error as exc:
+        raise DBAPIError.instance(sql, params, exc, psycopg2.Error) from exc
+
+"""
+Run a read query on the pooled connection's underlying psycopg2 connection and return plain tuples
+Used by large listings to skip SQLAlchemy's per-row Row/RowMapping construction
+The SQL must use psycopg2 placeholders (%(name)s) instead of SQLAlchemy's :name
+"""
+def raw_fetchall(connection, sql: str, params: Optional[Mapping[str, object]] = None):
+    cursor = connection.connection.cursor()
+    try:
+        with translate_db_errors(sql, params):
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+    finally:
+        cursor.close()
+
+"""
+Same as raw_fetchall, but each row comes back as a plain dict keyed by column name
+Meant for small bounded results (e.g. one user's saved routes) where a server-side cursor's extra round-trips would cost more than they save
+"""
+def raw_fetchall_dicts(connection, sql: str, params: Optional[Mapping[str, object]] = None):
+    cursor = connection.connection.cursor(cursor_factory=RealDictCursor)
+    try:
+        with translate_db_errors(sql, params):
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+_STREAM_CURSOR_IDS = count()
+
+"""
+Stream a read query through a server-side psycopg2 cursor, yielding one plain dict per row
+Rows arrive STREAM_YIELD_PER at a time and skip SQLAlchemy's Row/RowMapping wrappers entirely
+The SQL must use psycopg2 placeholders (%(name)s) instead of SQLAlchemy's :name
+"""
+def raw_iter_dicts(connection, sql: str, params: Optional[Mapping[str, object]] = None):
+    cursor = connection.connection.cursor(f"stream_{next(_STREAM_CURSOR_IDS)}", cursor_factory=RealDictCursor)
+    cursor.itersize = STREAM_YIELD_PER
+    try:
+        with translate_db_errors(sql, params):  # also covers the FETCHes made while iterating
+            cursor.execute(sql, params)
+            yield from cursor
+    finally:
+        cursor.close()
+
+
+"""
+Run COPY ... TO STDOUT on the pooled connection's underlying psycopg2 connection and return the raw bytes
+Used to hand binary COPY output straight to clients without decoding it row by row
+"""
+def raw_copy_out(connection, sql: str) -> bytes:
+    buffer = io.BytesIO()
+    cursor = connection.connection.cursor()
+    try:
+        with translate_db_errors(sql):
+            cursor.copy_expert(sql, buffer)
+        return buffer.getvalue()
+    finally:
+        cursor.close()
+
+
+
+"""
+Resolve the caller's identity once per request, before any route handler runs
+The decoded token and user row are stored on Flask's g so require_auth only has to read them
+When the caller is not authenticated g.auth is None and g.auth_error holds the (message, status) to return
+"""
+@webApp.before_request
+def load_request_auth():
+    g.auth = None
+    g.auth_error = ("Missing or invalid Authorization header", 401)
+
+    #extract authorization header and ensure it starts with Bearer
+    auth_header = request.headers.get('Authorization', '')
+    if not auth_header.startswith('Bearer '):
+        return None
+
+    #extract JWT token from header
+    token = auth_header.split(' ', 1)[1].strip()
+    try:
+        #decode and validate the JWT token
+        payload = decode_access_token(token)
+    except (jwt.ExpiredSignatureError, jwt.InvalidTokenError):
+        g.auth_error = ("Invalid or expired token", 401)
+        return None
+    #extract the authenticated user's ID from the token payload
+    user_id = int(payload.get('sub'))
+    #look the user up in the database to ensure they still exist and get their role
+    with get_db_connection() as connection:
+        row = connection.execute(
+            text(
+                """
+                SELECT userID AS "userID", username, email, userRole AS "userRole"
+                FROM USERS
+                WHERE userID = :uid
+                """
+            ),
+            {"uid": user_id},
+        ).mappings().fetchone()
+    #user not found, deny access
+    if row is None:
+        g.auth_error = ("User not found", 401)
+        return None
+
+    g.auth = {
+        "user_id": user_id,
+        "username": row["username"],
+        "email": row["email"],
+        "role": row["userRole"],
+    }
+    g.auth_error = None
+    return None
 
 
 """
@@ -188,53 +411,23 @@ def require_auth(required_role: str | None = None, enforce_user_match: bool = Fa
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
-            #extract authorization header and ensure it starts with Bearer
-            auth_header = request.headers.get('Authorization', '')
-            if not auth_header.startswith('Bearer '):
-                return jsonify({"message": "Missing or invalid Authorization header"}), 401
-
-            #extract JWT token from header
-            token = auth_header.split(' ', 1)[1].strip()
-            try:
-                #decode and validate the JWT token
-                payload = decode_access_token(token)
-            except (jwt.ExpiredSignatureError, jwt.InvalidTokenError):
-                return jsonify({"message": "Invalid or expired token"}), 401
-            #extract the authenticated user's ID from the token payload
-            user_id = int(payload.get('sub'))
-            #look the user up in the database to ensure they still exist and get their role
-            with get_db_connection() as connection:
-                row = connection.execute(
-                    text(
-                        """
-                        SELECT userID AS "userID", username, email, userRole AS "userRole"
-                        FROM USERS
-                        WHERE userID = :uid
-                        """
-                    ),
-                    {"uid": user_id},
-                ).mappings().fetchone()
-            #user not found, deny access
-            if row is None:
-                return jsonify({"message": "User not found"}), 401
+            #identity was already resolved by load_request_auth
+            auth = g.get("auth")
+            if auth is None:
+                message, status = g.get("auth_error") or ("Missing or invalid Authorization header", 401)
+                return jsonify({"message": message}), status
 
-            role = row["userRole"]
             #enforce role requirement if required
-            if required_role and role != required_role:
+            if required_role and auth["role"] != required_role:
                 return jsonify({"message": "Forbidden"}), 403
 
             #enforce user_id match when required
             if enforce_user_match:
                 path_user = kwargs.get('user_id') or request.view_args.get('user_id')
-                if path_user is not None and int(path_user) != user_id:
+                if path_user is not None and int(path_user) != auth["user_id"]:
                     return jsonify({"message": "Forbidden"}), 403
             #store authenticated user info in Flask global context
-            g.current_user = {
-                "user_id": user_id,
-                "username": row["username"],
-                "email": row["email"],
-                "role": role,
-            }
+            g.current_user = auth
             #proceed to protected route handler
             return func(*args, **kwargs)
 
@@ -274,7 +467,7 @@ def createAccount():
         }), 400
 
     pwd_hash = hash_password(password)#hash the password for security in the database
-    reg_date = datetime.utcnow().date().isoformat() #date of account creation (now)
+    reg_date = datetime.now(_UTC).date().isoformat() #date of account creation (now)
     default_role = "mapper" #provide default role to user which is a mapper, normal user
 
     try:
@@ -456,12 +649,22 @@ def lseg_to_pair(value):
 
     raise ValueError(f"Unable to parse line segment value: {value}")
 
+"""
+Transport mode IDs never change once created (the API never deletes them), so they are cached per process
+Only IDs read back from committed rows are cached, never ones inserted inside a transaction that may roll back
+"""
+_TRANSPORT_MODE_IDS: dict[str, int] = {}
+
 """
 Ensure transport mode exists
 Return its ID or create it using default values 
 """
 def ensure_transport_mode_id(connection, transport_type: str | None) -> int:
     normalized = transport_type if transport_type in TRANSPORT_MODE_DEFAULTS else DEFAULT_TRANSPORT_TYPE
+    cached_id = _TRANSPORT_MODE_IDS.get(normalized)
+    if cached_id is not None:
+        return cached_id
+
     existing_id = connection.execute(
         text(
             """
@@ -475,8 +678,9 @@ def ensure_transport_mode_id(connection, transport_type: str | None) -> int:
         {"tt": normalized},
     ).scalar_one_or_none()
 
-    #if it does exist, return its ID
+    #if it does exist, cache and return its ID
     if existing_id is not None:
+        _TRANSPORT_MODE_IDS[normalized] = existing_id
         return existing_id
 
     #does not exist so create a transport mode with a ID
@@ -548,6 +752,19 @@ def bootstrap_transport_modes():
         for transport_type in TRANSPORT_MODE_DEFAULTS:
             ensure_transport_mode_id(connection, transport_type)
 
+    #the modes are committed now, so cache every ID (matching the lowest-ID lookup in ensure_transport_mode_id)
+    with get_db_connection() as connection:
+        rows = connection.execute(
+            text(
+                """
+                SELECT transportType, MIN(transportID)
+                FROM MODE_OF_TRANSPORT
+                GROUP BY transportType
+                """
+            )
+        ).all()
+    _TRANSPORT_MODE_IDS.update({transport_type: transport_id for transport_type, transport_id in rows})
+
 
 def bootstrap_location_types():
     with db_engine.begin() as connection:
@@ -611,6 +828,33 @@ def bootstrap_vehicle_reference():
             )
 
 
+def bootstrap_road_version():
+    with db_engine.begin() as connection:
+        connection.execute(text("CREATE SEQUENCE IF NOT EXISTS road_version_seq"))
+
+
+"""
+Create any missing secondary indexes
+Each index gets its own transaction so one failure does not roll back the rest
+"""
+def bootstrap_indexes():
+    for statement in SCHEMA_INDEXES:
+        try:
+            with db_engine.begin() as connection:
+                connection.execute(text(statement))
+        except SQLAlchemyError as exc:
+            print("Warning: unable to create index", exc)
+
+
+"""
+Create the admin_totals materialized view and the unique index it refreshes against
+"""
+def bootstrap_admin_totals():
+    with db_engine.begin() as connection:
+        connection.execute(text(ADMIN_TOTALS_VIEW))
+        connection.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS admin_totals_key_idx ON admin_totals(totals_key)"))
+
+
 try:
     bootstrap_transport_modes()
     bootstrap_location_types()
@@ -619,10 +863,41 @@ try:
 except SQLAlchemyError as exc:
     print("Warning: unable to bootstrap reference data", exc)
 
+#schema objects are independent of each other, one failing must not skip the rest
+for bootstrap_schema_step in (bootstrap_road_version, bootstrap_indexes, bootstrap_admin_totals):
+    try:
+        bootstrap_schema_step()
+    except SQLAlchemyError as exc:
+        print("Warning: unable to bootstrap schema objects", exc)
+
 
 # ---- Location and road helper functions ----
 
 
+"""
+Read the current road graph version
+road_version_seq is advanced after every committed change to ROAD or CONNECTS_TO
+Adding is_called distinguishes a fresh sequence from one advanced once (both report last_value = 1)
+"""
+def current_road_version(connection) -> int:
+    return connection.execute(
+        text("SELECT last_value + is_called::int FROM road_version_seq")
+    ).scalar_one()
+
+
+"""
+Advance the road graph version so every worker rebuilds its cached graphs
+Must run after the changing transaction commits, otherwise a concurrent reader could cache the old graph under the new version
+nextval is not transactional, so any connection will do
+"""
+def bump_road_version():
+    try:
+        with get_db_connection() as connection:
+            connection.execute(text("SELECT nextval('road_version_seq')"))
+    except SQLAlchemyError as exc:
+        print("Warning: unable to advance road version", exc)
+
+
 def currency_exists(connection, currency_name: Optional[str]) -> bool:
     if not currency_name:
         return False
@@ -659,9 +934,9 @@ def build_currency_map(connection, user_id: int):
         {"uid": user_id},
     ).mappings().all()
 
-    mapping = defaultdict(list)
+    mapping = {}
     for row in rows:
-        mapping[row["locationID"]].append({
+        mapping.setdefault(row["locationID"], []).append({
             "currencyName": row["currencyName"],
             "currencySymbol": row["currencySymbol"],
         })
@@ -685,9 +960,9 @@ def build_landmark_map(connection, user_id: int):
         {"uid": user_id},
     ).mappings().all()
 
-    mapping = defaultdict(list)
+    mapping = {}
     for row in rows:
-        mapping[row["locationID"]].append({
+        mapping.setdefault(row["locationID"], []).append({
             "landmarkName": row["landmarkName"],
             "locationID": row["locationID"],
             "landmarkDescription": row["landmarkDescription"],
@@ -760,10 +1035,13 @@ def load_user_vehicle(connection, user_id: int, vehicle_id: Optional[int]):
 Fetch all locations created by a specific user (through their user_id)
 """
 def fetch_locations(connection, user_id: int):
-    #select rows with all information related to location
-    rows = connection.execute(
-        text(
-            """
+    currency_map = build_currency_map(connection, user_id)
+    landmark_map = build_landmark_map(connection, user_id)
+
+    #select rows with all information related to location, streamed from a server-side cursor
+    rows = raw_iter_dicts(
+        connection,
+        """
             SELECT
                 c.locationID   AS "locationID",
                 c.coordinate   AS "coordinate",
@@ -775,15 +1053,12 @@ def fetch_locations(connection, user_id: int):
                 c.createdBy    AS "createdBy"
             FROM CELL c
             JOIN CELL_TYPE_INFO info ON info.locationType = c.locationType
-            WHERE c.createdBy = :uid
+            WHERE c.createdBy = %(uid)s
             ORDER BY c.locationID
-            """
-        ),
+        """,
         {"uid": user_id},
-    ).mappings().all()
+    )
 
-    currency_map = build_currency_map(connection, user_id)
-    landmark_map = build_landmark_map(connection, user_id)
     locations = []
     #add info to the locations list
     for row in rows:
@@ -807,10 +1082,10 @@ def fetch_locations(connection, user_id: int):
 Fetch all roads and their related information
 """
 def fetch_roads(connection, owner_id: Optional[int] = None):
-    #select rows with all information related to the road
-    rows = connection.execute(
-        text(
-            """
+    #select rows with all information related to the road, streamed from a server-side cursor
+    rows = raw_iter_dicts(
+        connection,
+        """
             SELECT
                 r.roadID      AS "roadID",
                 r.roadSegment AS "roadSegment",
@@ -825,12 +1100,11 @@ def fetch_roads(connection, owner_id: Optional[int] = None):
             LEFT JOIN CONNECTS_TO ct ON ct.roadID = r.roadID
             LEFT JOIN CELL c ON c.locationID = ct.locationID
             LEFT JOIN USERS u ON u.userID = c.createdBy
-            WHERE (:owner_id IS NULL OR c.createdBy = :owner_id)
+            WHERE (%(owner_id)s IS NULL OR c.createdBy = %(owner_id)s)
             ORDER BY r.roadID
-            """
-        ),
+        """,
         {"owner_id": owner_id},
-    ).mappings().all()
+    )
 
     roads = {}
     #add information to dict
@@ -864,9 +1138,9 @@ def fetch_roads(connection, owner_id: Optional[int] = None):
 Fetch all saved routes created by a specific user (through their user_id)
 """
 def fetch_saved_routes(connection, user_id: int):
-    rows = connection.execute(
-        text(
-            """
+    rows = raw_fetchall_dicts(
+        connection,
+        """
             SELECT
                 tr.routeID          AS "routeID",
                 tr.modeOfTransportID AS "modeOfTransportID",
@@ -882,12 +1156,11 @@ def fetch_saved_routes(connection, user_id: int):
             FROM TRAVEL_ROUTE tr
             JOIN VEHICLE v ON v.vehicleID = tr.vehicleID
             LEFT JOIN MODE_OF_TRANSPORT mot ON mot.transportID = tr.modeOfTransportID
-            WHERE v.ownedBy = :uid
+            WHERE v.ownedBy = %(uid)s
             ORDER BY tr.routeID DESC
-            """
-        ),
+        """,
         {"uid": user_id},
-    ).mappings().all()
+    )
 
     routes = []
     for row in rows:
@@ -909,148 +1182,159 @@ def fetch_saved_routes(connection, user_id: int):
     return routes
 
 """
-Ensure a road-location relationship exists (ignoring duplicates)
+Find roads that already cover the given location pairs, in either direction, with one query
+Returns a dict of pair index -> roadID
 """
-def ensure_connects_to(connection, road_id: int, location_id: int):
-    connection.execute(
-        text(
-            """
-            INSERT INTO CONNECTS_TO (roadID, locationID)
-            VALUES (:road_id, :location_id)
-            ON CONFLICT DO NOTHING
-            """
-        ),
-        {"road_id": road_id, "location_id": location_id},
-    )
+def find_existing_road_segments(connection, pairs):
+    columns = {"idx": [], "ax": [], "ay": [], "bx": [], "by": []}
+    for idx, (loc_a, loc_b) in enumerate(pairs):
+        columns["idx"].append(idx)
+        columns["ax"].append(loc_a["coordinate"][0])
+        columns["ay"].append(loc_a["coordinate"][1])
+        columns["bx"].append(loc_b["coordinate"][0])
+        columns["by"].append(loc_b["coordinate"][1])
 
-"""
-Check if a road segment already exists between two coordinates
-"""
-def road_segment_exists(connection, coord_a, coord_b):
-    return connection.execute(
-        text(
-            """
-            SELECT roadID AS "roadID"
-            FROM ROAD
-            WHERE roadSegment = lseg(point(:ax, :ay), point(:bx, :by))
-               OR roadSegment = lseg(point(:bx, :by), point(:ax, :ay))
-            LIMIT 1
-            """
-        ),
-        {
-            "ax": coord_a[0],
-            "ay": coord_a[1],
-            "bx": coord_b[0],
-            "by": coord_b[1],
-        },
-    ).scalar_one_or_none()
-
-"""
-Ensure a road exists between two locations and create one if it doesn't
-"""
-def ensure_road_between_locations(connection, loc_a, loc_b):
-    coord_a = tuple(loc_a["coordinate"])
-    coord_b = tuple(loc_b["coordinate"])
-    if coord_a == coord_b:
-        return
-
-    existing = road_segment_exists(connection, coord_a, coord_b)
-    #exists!
-    if existing is not None:
-        ensure_connects_to(connection, existing, loc_a["locationID"])
-        ensure_connects_to(connection, existing, loc_b["locationID"])
-        return
-
-    #does not exist so create one
-    distance = math.dist(coord_a, coord_b)
-    road_name = f"AutoRoute {loc_a['locationID']}↔{loc_b['locationID']}"
-    road_id = connection.execute(
-        text(
-            """
-            INSERT INTO ROAD (roadSegment, roadName, distance, roadType)
-            VALUES (lseg(point(:ax, :ay), point(:bx, :by)), :roadName, :distance, 'unblocked')
-            RETURNING roadID AS "roadID"
-            """
-        ),
-        {
-            "ax": coord_a[0],
-            "ay": coord_a[1],
-            "bx": coord_b[0],
-            "by": coord_b[1],
-            "roadName": road_name,
-            "distance": round(distance, 3),
-        },
-    ).scalar_one()
+    rows = raw_fetchall(
+        connection,
+        """
+        SELECT p.idx, r.roadID
+        FROM unnest(%(idx)s::int[], %(ax)s::float8[], %(ay)s::float8[], %(bx)s::float8[], %(by)s::float8[])
+             AS p(idx, ax, ay, bx, by)
+        JOIN ROAD r
+          ON r.roadSegment = lseg(point(p.ax, p.ay), point(p.bx, p.by))
+          OR r.roadSegment = lseg(point(p.bx, p.by), point(p.ax, p.ay))
+        ORDER BY p.idx, r.roadID
+        """,
+        columns,
+    )
 
-    ensure_connects_to(connection, road_id, loc_a["locationID"])
-    ensure_connects_to(connection, road_id, loc_b["locationID"])
+    existing = {}
+    for idx, road_id in rows:
+        existing.setdefault(idx, road_id)
+    return existing
 
 """
 Ensure triangular road connections for a user
 Meaning, a road between every pair of locations
+Missing roads and their CONNECTS_TO links are written with batched multi-row INSERTs instead of one statement per pair
 """
 def ensure_triangular_roads_for_user(connection, user_id: int):
     locations = fetch_locations(connection, user_id)
     if len(locations) < 3:
         return
 
-    for loc_a, loc_b in combinations(locations, 2):
-        ensure_road_between_locations(connection, loc_a, loc_b)
+    pairs = [
+        (loc_a, loc_b)
+        for loc_a, loc_b in combinations(locations, 2)
+        if tuple(loc_a["coordinate"]) != tuple(loc_b["coordinate"])
+    ]
+    if not pairs:
+        return
+
+    existing = find_existing_road_segments(connection, pairs)
+
+    #pairs sharing a segment (locations on the same coordinate) share a single road
+    pair_segments = []
+    for loc_a, loc_b in pairs:
+        coord_a = tuple(loc_a["coordinate"])
+        coord_b = tuple(loc_b["coordinate"])
+        pair_segments.append((coord_a, coord_b) if coord_a <= coord_b else (coord_b, coord_a))
+
+    road_ids = {pair_segments[idx]: road_id for idx, road_id in existing.items()}
+    new_roads = {}
+    for (loc_a, loc_b), segment in zip(pairs, pair_segments):
+        if segment not in road_ids and segment not in new_roads:
+            coord_a = tuple(loc_a["coordinate"])
+            coord_b = tuple(loc_b["coordinate"])
+            new_roads[segment] = (
+                coord_a[0],
+                coord_a[1],
+                coord_b[0],
+                coord_b[1],
+                f"AutoRoute {loc_a['locationID']}↔{loc_b['locationID']}",
+                round(math.dist(coord_a, coord_b), 3),
+            )
+
+    road_insert_sql = """
+        INSERT INTO ROAD (roadSegment, roadName, distance, roadType)
+        VALUES %s
+        RETURNING roadID, roadName
+    """
+    link_insert_sql = """
+        INSERT INTO CONNECTS_TO (roadID, locationID)
+        VALUES %s
+        ON CONFLICT DO NOTHING
+    """
+    cursor = connection.connection.cursor()
+    try:
+        if new_roads:
+            with translate_db_errors(road_insert_sql):  # e.g. a roadName clash surfaces as IntegrityError
+                created = execute_values(
+                    cursor,
+                    road_insert_sql,
+                    list(new_roads.values()),
+                    template="(lseg(point(%s, %s), point(%s, %s)), %s, %s, 'unblocked')",
+                    page_size=200,
+                    fetch=True,
+                )
+            road_id_by_name = {road_name: road_id for road_id, road_name in created}
+            for segment, values in new_roads.items():
+                road_ids[segment] = road_id_by_name[values[4]]
+
+        links = set()
+        for (loc_a, loc_b), segment in zip(pairs, pair_segments):
+            road_id = road_ids[segment]
+            links.add((road_id, loc_a["locationID"]))
+            links.add((road_id, loc_b["locationID"]))
+
+        with translate_db_errors(link_insert_sql):
+            execute_values(cursor, link_insert_sql, sorted(links), page_size=200)
+    finally:
+        cursor.close()
 
 
 """
 Remove auto generated roads if a user does not have enough locations
 """
 def prune_auto_roads_for_user(connection, user_id: int) -> int:
-    remaining_locations = fetch_locations(connection, user_id)
-    if len(remaining_locations) >= 3:
-        return 0
-
-    road_ids = connection.execute(
+    #one statement: the location count check, the road selection and both deletes all run in SQL
+    return connection.execute(
         text(
             """
-            SELECT r.roadID AS "roadID"
-            FROM ROAD r
-            WHERE r.roadName LIKE 'AutoRoute %'
-              AND (
-                    NOT EXISTS (
-                        SELECT 1
-                        FROM CONNECTS_TO ct
-                        WHERE ct.roadID = r.roadID
-                    )
-                    OR NOT EXISTS (
+            WITH doomed AS (
+                SELECT r.roadID
+                FROM ROAD r
+                WHERE (SELECT COUNT(*) FROM CELL WHERE createdBy = :uid) < 3
+                  AND r.roadName LIKE 'AutoRoute %'
+                  AND NOT EXISTS (
                         SELECT 1
                         FROM CONNECTS_TO ct
                         JOIN CELL c ON c.locationID = ct.locationID
                         WHERE ct.roadID = r.roadID
                           AND c.createdBy <> :uid
-                    )
                   )
+            ),
+            unlinked AS (
+                DELETE FROM CONNECTS_TO
+                WHERE roadID IN (SELECT roadID FROM doomed)
+            ),
+            pruned AS (
+                DELETE FROM ROAD
+                WHERE roadID IN (SELECT roadID FROM doomed)
+                RETURNING roadID
+            )
+            SELECT COUNT(*) FROM pruned
             """
         ),
         {"uid": user_id},
-    ).scalars().all()
-
-    removed = 0
-    for rid in road_ids:
-        connection.execute(
-            text("DELETE FROM CONNECTS_TO WHERE roadID = :rid"),
-            {"rid": rid},
-        )
-        result = connection.execute(
-            text("DELETE FROM ROAD WHERE roadID = :rid"),
-            {"rid": rid},
-        )
-        removed += result.rowcount or 0
-
-    return removed
+    ).scalar_one()
 
 
 # ---- Deletion utilities for user-owned data ----
 
 """
-Delete a single location entry and its associated routes 
-Prune auto generated roads afterwards
+Clean up after a location row that has already been deleted (DELETE FROM CELL ... RETURNING)
+Removes the owner's routes that start or end on it, then prunes auto generated roads
 """
 def delete_location_entry(connection, location_row: Mapping[str, object]):
     normalized = dict(location_row) #normalize into mutable dict
@@ -1062,12 +1346,9 @@ def delete_location_entry(connection, location_row: Mapping[str, object]):
     if owner_id is None:
         raise ValueError("Location owner missing")
 
-    location_id = normalized.get("locationID") #extract location_id
-    if location_id is None:
-        raise ValueError("Location ID missing")
-
     x_coord, y_coord = coord_pair
     #delete all routes where this location is either the start or end point
+    #~= is only equal within EPSILON but can use the GiST indexes, the [0]/[1] checks keep the match exact
     deleted_routes = connection.execute(
         text(
             """
@@ -1076,22 +1357,17 @@ def delete_location_entry(connection, location_row: Mapping[str, object]):
             WHERE tr.vehicleID = v.vehicleID
               AND v.ownedBy = :uid
               AND (
-                                        (tr.startCellCoord[0] = :x AND tr.startCellCoord[1] = :y)
-                                 OR (tr.endCellCoord[0] = :x AND tr.endCellCoord[1] = :y)
+                    (tr.startCellCoord ~= point(:x, :y) AND tr.startCellCoord[0] = :x AND tr.startCellCoord[1] = :y)
+                 OR (tr.endCellCoord ~= point(:x, :y) AND tr.endCellCoord[0] = :x AND tr.endCellCoord[1] = :y)
               )
             """
         ),
         {"uid": owner_id, "x": x_coord, "y": y_coord},
-    )
-    #remove location itself
-    connection.execute(
-        text("DELETE FROM CELL WHERE locationID = :lid AND createdBy = :uid"),
-        {"lid": location_id, "uid": owner_id},
-    )
+    ).rowcount
 
     pruned_roads = prune_auto_roads_for_user(connection, owner_id) #clean up
 
-    return deleted_routes.rowcount or 0, pruned_roads #return number of routes deleted and roads pruned
+    return deleted_routes, pruned_roads #return number of routes deleted and roads pruned
 
 
 """
@@ -1099,28 +1375,24 @@ Delete all records belonging to a specific user
 This includes routes, locations, user account itself
 """
 def delete_user_records(connection, user_id: int) -> bool:
-    #remove all routes
-    connection.execute(
+    #remove all routes, all locations created by that user and the user themselves in one statement
+    result = connection.execute(
         text(
             """
-            DELETE FROM TRAVEL_ROUTE tr
-            USING VEHICLE v
-            WHERE tr.vehicleID = v.vehicleID
-              AND v.ownedBy = :uid
+            WITH removed_routes AS (
+                DELETE FROM TRAVEL_ROUTE tr
+                USING VEHICLE v
+                WHERE tr.vehicleID = v.vehicleID
+                  AND v.ownedBy = :uid
+            ),
+            removed_locations AS (
+                DELETE FROM CELL WHERE createdBy = :uid
+            )
+            DELETE FROM USERS WHERE userID = :uid
             """
         ),
         {"uid": user_id},
     )
-    #remove all locations created by that user
-    connection.execute(
-        text("DELETE FROM CELL WHERE createdBy = :uid"),
-        {"uid": user_id},
-    )
-    #remove the user themselves
-    result = connection.execute(
-        text("DELETE FROM USERS WHERE userID = :uid"),
-        {"uid": user_id},
-    )
     return result.rowcount > 0
 
 @webApp.route("/<int:user_id>/getGraph", methods=["GET"])
@@ -1180,6 +1452,7 @@ def addLocation(user_id):
 
             ensure_triangular_roads_for_user(connection, user_id)
 
+        bump_road_version()
         return jsonify({"success": True, "locationID": result["locationID"]}), 201
     except SQLAlchemyError as exc:
         print("Error adding location", exc)
@@ -1201,15 +1474,15 @@ def removeLocation(user_id):
 
     try:
         with db_engine.begin() as connection:
+            #delete the location up front, the returned row drives the cleanup of its routes and roads
             row = connection.execute(
                 text(
                     """
-                    SELECT locationID AS "locationID",
-                           coordinate AS "coordinate",
-                           createdBy AS "createdBy"
-                    FROM CELL
+                    DELETE FROM CELL
                     WHERE locationID = :lid AND createdBy = :uid
-                    FOR UPDATE
+                    RETURNING locationID AS "locationID",
+                              coordinate AS "coordinate",
+                              createdBy AS "createdBy"
                     """
                 ),
                 {"lid": location_id, "uid": user_id},
@@ -1220,6 +1493,7 @@ def removeLocation(user_id):
 
             removed_routes, pruned_roads = delete_location_entry(connection, row)
 
+        bump_road_version()
         return jsonify({
             "success": True,
             "removedRoutes": removed_routes,
@@ -1229,6 +1503,26 @@ def removeLocation(user_id):
         print("Error removing location", exc)
         return jsonify({"message": "Unable to remove location"}), 500
 
+UPDATE_LOCATION_COLUMNS = ("locationName", "locationType", "maxCapacity", "parkingSpaces")
+UPDATE_LOCATION_COORD_BIT = 1 << len(UPDATE_LOCATION_COLUMNS)
+
+"""
+Build the UPDATE CELL statement for one combination of fields
+Bit i of mask selects UPDATE_LOCATION_COLUMNS[i] and UPDATE_LOCATION_COORD_BIT selects the coordinate
+Each combination is built once and the same TextClause is reused, so SQLAlchemy's compiled cache hits
+"""
+@lru_cache(maxsize=None)
+def update_location_statement(mask: int):
+    assignments = [
+        f"{column} = :{column}"
+        for bit, column in enumerate(UPDATE_LOCATION_COLUMNS)
+        if mask & (1 << bit)
+    ]
+    if mask & UPDATE_LOCATION_COORD_BIT:
+        assignments.append("coordinate = point(:coord_x, :coord_y)")
+
+    return text("UPDATE CELL SET " + ", ".join(assignments) + " WHERE locationID = :locationID AND createdBy = :uid")
+
 """
 Updates a specified user's graph by updating a location
 PARAMS
@@ -1254,28 +1548,27 @@ def updateLocation(user_id):
         return jsonify({"message": "Invalid locationType"}), 400
 
     coordinate = payload.get("coordinate")
-    assignments = []
+    mask = 0
     params = {"locationID": location_id, "uid": user_id}
 
-    for column, value in fields.items():
+    for bit, column in enumerate(UPDATE_LOCATION_COLUMNS):
+        value = fields[column]
         if value is not None:
-            assignments.append(f"{column} = :{column}")
+            mask |= 1 << bit
             params[column] = value
 
     if coordinate and len(coordinate) == 2:
-        assignments.append("coordinate = point(:coord_x, :coord_y)")
+        mask |= UPDATE_LOCATION_COORD_BIT
         params["coord_x"], params["coord_y"] = coordinate
 
-    if not assignments:
+    if not mask:
         return jsonify({"message": "No fields to update"}), 400
 
-    query = "UPDATE CELL SET " + ", ".join(assignments) + " WHERE locationID = :locationID AND createdBy = :uid"
-
     try:
         with db_engine.begin() as connection:
             if new_location_type is not None:
                 ensure_location_type_row(connection, new_location_type)
-            connection.execute(text(query), params)
+            connection.execute(update_location_statement(mask), params)
         return jsonify({"success": True}), 200
     except SQLAlchemyError as exc:
         print("Error updating location", exc)
@@ -1836,19 +2129,30 @@ def computePath(user_id):
 
     try:
         with get_db_connection() as connection:
-            adjacency = build_road_graph(connection, user_id)
+            graph = load_road_graph(connection, user_id)
 
-        path, total_distance = aStarSearch(user_id, start, end, pit_stops, adjacency)
+        path, total_distance = aStarSearch(user_id, start, end, pit_stops, graph)
         if path is None:
             return jsonify({"message": "No path found", "path": []}), 404
 
-        path_list = [[coord[0], coord[1]] for coord in path]
+        #directions are only built when the client asks for them with ?directions=1
+        path_list = []
+        directions = []
+        if request.args.get("directions") == "1":
+            for x, y in path:
+                pair = [x, y]
+                path_list.append(pair)
+                directions.append("Proceed to " + repr(pair))
+        else:
+            for x, y in path:
+                path_list.append([x, y])
+
         summary = {
             "path": path_list,
             "totalDistance": total_distance,
             "totalTime": total_distance,
             "totalCost": 0,
-            "directions": [f"Proceed to {pt}" for pt in path_list],
+            "directions": directions,
             "closedAreas": [],
         }
         return jsonify(summary), 200
@@ -1887,46 +2191,18 @@ def saveRoute(user_id):
                     {"tid": transport_id, "vid": vehicle_row["vehicleID"]},
                 )
 
-            existing_route_id = connection.execute(
-                text(
-                    """
-                    SELECT tr.routeID AS "routeID"
-                    FROM TRAVEL_ROUTE tr
-                    JOIN VEHICLE v ON v.vehicleID = tr.vehicleID
-                    WHERE v.ownedBy = :owner
-                      AND tr.modeOfTransportID = :mode
-                      AND tr.vehicleID = :vehicleID
-                                            AND tr.startCellCoord[0] = :sx
-                                            AND tr.startCellCoord[1] = :sy
-                                            AND tr.endCellCoord[0] = :ex
-                                            AND tr.endCellCoord[1] = :ey
-                      AND tr.travelTime = :travelTime
-                      AND tr.totalDistance = :totalDistance
-                                            AND tr.totalCost = :totalCost
-                    LIMIT 1
-                    """
-                ),
-                {
-                    "owner": user_id,
-                    "mode": transport_id,
-                    "vehicleID": vehicle_row["vehicleID"],
-                    "sx": start[0],
-                    "sy": start[1],
-                    "ex": end[0],
-                    "ey": end[1],
-                    "travelTime": payload.get("travelTime", ""),
-                    "totalDistance": payload.get("totalDistance", ""),
-                                        "totalCost": payload.get("totalCost", ""),
-                },
-            ).scalar_one_or_none()
-
-            if existing_route_id is not None:
-                return jsonify({
-                    "success": True,
-                    "routeID": existing_route_id,
-                    "duplicate": True,
-                }), 200
-
+            route_params = {
+                "mode": transport_id,
+                "vehicleID": vehicle_row["vehicleID"],
+                "sx": start[0],
+                "sy": start[1],
+                "ex": end[0],
+                "ey": end[1],
+                "travelTime": payload.get("travelTime", ""),
+                "totalDistance": payload.get("totalDistance", ""),
+                "totalCost": payload.get("totalCost", ""),
+            }
+            #insert the route, travel_route_dedupe_idx turns an identical save into a no-op instead of a dead tuple
             route_id = connection.execute(
                 text(
                     """
@@ -1937,21 +2213,39 @@ def saveRoute(user_id):
                         :mode, :vehicleID, point(:sx, :sy), point(:ex, :ey),
                         :travelTime, :totalDistance, :totalCost
                     )
+                    ON CONFLICT DO NOTHING
                     RETURNING routeID
                     """
                 ),
-                {
-                    "mode": transport_id,
-                    "vehicleID": vehicle_row["vehicleID"],
-                    "sx": start[0],
-                    "sy": start[1],
-                    "ex": end[0],
-                    "ey": end[1],
-                    "travelTime": payload.get("travelTime", ""),
-                    "totalDistance": payload.get("totalDistance", ""),
-                    "totalCost": payload.get("totalCost", ""),
-                },
-            ).scalar_one()
+                route_params,
+            ).scalar_one_or_none()
+
+            if route_id is None:
+                #nothing inserted, so the identical route is already saved
+                existing_route_id = connection.execute(
+                    text(
+                        """
+                        SELECT routeID AS "routeID"
+                        FROM TRAVEL_ROUTE
+                        WHERE vehicleID = :vehicleID
+                          AND modeOfTransportID = :mode
+                          AND startCellCoord[0] = :sx
+                          AND startCellCoord[1] = :sy
+                          AND endCellCoord[0] = :ex
+                          AND endCellCoord[1] = :ey
+                          AND travelTime = :travelTime
+                          AND totalDistance = :totalDistance
+                          AND totalCost = :totalCost
+                        LIMIT 1
+                        """
+                    ),
+                    route_params,
+                ).scalar_one_or_none()
+                return jsonify({
+                    "success": True,
+                    "routeID": existing_route_id,
+                    "duplicate": True,
+                }), 200
 
         return jsonify({"success": True, "routeID": route_id}), 201
     except SQLAlchemyError as exc:
@@ -1989,6 +2283,7 @@ def update_road_status(road_id):
         if result.rowcount == 0:
             return jsonify({"message": "Road not found"}), 404
 
+        bump_road_version()
         return jsonify({"success": True, "roadType": new_status}), 200
     except SQLAlchemyError as exc:
         print("Error updating road status", exc)
@@ -1996,10 +2291,29 @@ def update_road_status(road_id):
 
 # ==== Profile data and account lifecycle ====
 
+"""
+Worker threads for the independent profile queries
+psycopg2 releases the GIL while it waits on the server, so the queries overlap on separate pooled connections
+"""
+_PROFILE_EXECUTOR = ThreadPoolExecutor(max_workers=6, thread_name_prefix="profile-fetch")
+
+
+"""
+Run one fetch_* helper on its own pooled connection
+"""
+def fetch_on_own_connection(fetch, user_id: int):
+    with get_db_connection() as connection:
+        return fetch(connection, user_id)
+
 @webApp.route("/<int:user_id>/", methods=["GET"])
 @require_auth(enforce_user_match=True)
 def getProfileData(user_id):
     try:
+        #start the listings first, they do not depend on the user row
+        locations_future = _PROFILE_EXECUTOR.submit(fetch_on_own_connection, fetch_locations, user_id)
+        routes_future = _PROFILE_EXECUTOR.submit(fetch_on_own_connection, fetch_saved_routes, user_id)
+        roads_future = _PROFILE_EXECUTOR.submit(fetch_on_own_connection, fetch_roads, user_id)
+
         with get_db_connection() as connection:
             user_row = connection.execute(
                 text(
@@ -2017,12 +2331,12 @@ def getProfileData(user_id):
                 {"uid": user_id},
             ).mappings().fetchone()
 
-            if user_row is None:
-                return jsonify({"message": "User not found"}), 404
+        if user_row is None:
+            return jsonify({"message": "User not found"}), 404
 
-            locations = fetch_locations(connection, user_id)
-            routes = fetch_saved_routes(connection, user_id)
-            roads = fetch_roads(connection, user_id)
+        locations = locations_future.result()
+        routes = routes_future.result()
+        roads = roads_future.result()
 
         user_payload = {
             "userID": user_row["userID"],
@@ -2048,6 +2362,7 @@ def delete_account(user_id):
         if not deleted:
             return jsonify({"message": "User not found"}), 404
 
+        bump_road_version()
         return jsonify({"success": True}), 200
     except SQLAlchemyError as exc:
         print("Error deleting account", exc)
@@ -2055,28 +2370,49 @@ def delete_account(user_id):
 #----------------------------
 
 # ==== Admin analytics and management endpoints ====
+_ADMIN_TOTALS_REFRESH_LOCK = threading.Lock()
+
+
+"""
+Read the admin_totals snapshot row
+"""
+def read_admin_totals():
+    with get_db_connection() as connection:
+        return connection.execute(
+            text(
+                """
+                SELECT total_users, total_locations, total_routes, blocked_roads,
+                       pending_requests, refreshed_at
+                FROM admin_totals
+                """
+            )
+        ).fetchone()
+
+
+"""
+Refresh admin_totals without blocking readers
+Only one worker refreshes at a time, the others keep serving the current snapshot
+Returns True when this call performed the refresh
+"""
+def refresh_admin_totals():
+    if not _ADMIN_TOTALS_REFRESH_LOCK.acquire(blocking=False):
+        return False
+    try:
+        with db_engine.begin() as connection:
+            connection.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY admin_totals"))
+        return True
+    finally:
+        _ADMIN_TOTALS_REFRESH_LOCK.release()
+
+
 @webApp.route("/admin/overview", methods=["GET"])
 @require_auth(required_role="admin")
 def get_admin_overview():
     try:
-        with get_db_connection() as connection:
-            totals = connection.execute(
-                text(
-                    """
-                    SELECT
-                        (SELECT COUNT(*) FROM USERS) AS total_users,
-                        (SELECT COUNT(*) FROM CELL) AS total_locations,
-                        (SELECT COUNT(*) FROM TRAVEL_ROUTE) AS total_routes,
-                        (SELECT COUNT(*) FROM ROAD WHERE roadType = 'blocked') AS blocked_roads,
-                        (
-                            SELECT COUNT(*)
-                            FROM CELL c
-                            JOIN CELL_TYPE_INFO info ON info.locationType = c.locationType
-                            WHERE NOT info.isPublic
-                        ) AS pending_requests
-                    """
-                )
-            ).fetchone()
+        totals = read_admin_totals()
+        if totals is None or datetime.now(_UTC) - totals.refreshed_at > ADMIN_TOTALS_MAX_AGE:
+            if refresh_admin_totals():
+                totals = read_admin_totals()
 
         payload = {
             "totalUsers": totals.total_users,
@@ -2084,7 +2420,7 @@ def get_admin_overview():
             "totalRoutes": totals.total_routes,
             "blockedRoads": totals.blocked_roads,
             "pendingRequests": totals.pending_requests,
-            "lastSync": datetime.utcnow().isoformat() + "Z",
+            "lastSync": totals.refreshed_at.astimezone(_UTC),
         }
         return jsonify(payload), 200
     except SQLAlchemyError as exc:
@@ -2096,55 +2432,59 @@ def get_admin_overview():
 @require_auth(required_role="admin")
 def get_admin_users():
     limit = min(int(request.args.get("limit", 50)), 200)
-    offset = max(int(request.args.get("offset", 0)), 0)
+    after_id = max(int(request.args.get("after", 0)), 0)
 
     try:
         with get_db_connection() as connection:
-            rows = connection.execute(
-                text(
-                    """
-                    WITH location_counts AS (
-                        SELECT createdBy AS user_id, COUNT(*) AS total
-                        FROM CELL
-                        GROUP BY createdBy
-                    ),
-                    route_counts AS (
-                        SELECT v.ownedBy AS user_id, COUNT(*) AS total
-                        FROM TRAVEL_ROUTE tr
-                        JOIN VEHICLE v ON v.vehicleID = tr.vehicleID
-                        GROUP BY v.ownedBy
-                    )
+            #keyset page, counts come from index lookups on CELL(createdBy) and VEHICLE(ownedBy)
+            rows = raw_fetchall(
+                connection,
+                """
                     SELECT
                         u.userID AS "userID",
                         u.username AS "username",
                         u.email AS "email",
                         u.userRole AS "userRole",
-                        COALESCE(loc.total, 0) AS "locations",
-                        COALESCE(rt.total, 0) AS "savedRoutes",
+                        loc.total AS "locations",
+                        rt.total AS "savedRoutes",
                         u.registrationDate AS "lastActive"
                     FROM USERS u
-                    LEFT JOIN location_counts loc ON loc.user_id = u.userID
-                    LEFT JOIN route_counts rt ON rt.user_id = u.userID
+                    LEFT JOIN LATERAL (
+                        SELECT COUNT(*) AS total
+                        FROM CELL
+                        WHERE createdBy = u.userID
+                    ) loc ON TRUE
+                    LEFT JOIN LATERAL (
+                        SELECT COUNT(*) AS total
+                        FROM TRAVEL_ROUTE tr
+                        JOIN VEHICLE v ON v.vehicleID = tr.vehicleID
+                        WHERE v.ownedBy = u.userID
+                    ) rt ON TRUE
+                    WHERE u.userID > %(after_id)s
                     ORDER BY u.userID
-                    LIMIT :limit OFFSET :offset
-                    """
-                ),
-                {"limit": limit, "offset": offset},
-            ).mappings().fetchall()
-
-        users = []
-        for row in rows:
-            users.append({
-                "userID": row["userID"],
-                "username": row["username"],
-                "email": row["email"],
-                "role": row["userRole"],
-                "locations": row["locations"],
-                "savedRoutes": row["savedRoutes"],
-                "lastActive": row["lastActive"],
-            })
+                    LIMIT %(limit)s
+                """,
+                {"after_id": after_id, "limit": limit},
+            )
 
-        return jsonify(users), 200
+        users = [
+            {
+                "userID": user_id,
+                "username": username,
+                "email": email,
+                "role": role,
+                "locations": locations,
+                "savedRoutes": saved_routes,
+                "lastActive": last_active,
+            }
+            for user_id, username, email, role, locations, saved_routes, last_active in rows
+        ]
+
+        response = jsonify(users)
+        #body stays a plain array, the cursor for the next page rides in a header
+        if len(users) == limit:
+            response.headers["X-Next-Cursor"] = str(users[-1]["userID"])
+        return response, 200
     except SQLAlchemyError as exc:
         print("Error loading admin users", exc)
         return jsonify({"message": "Unable to load user roster"}), 500
@@ -2179,38 +2519,41 @@ def update_admin_user_role(target_id):
 def admin_all_locations():
     try:
         with get_db_connection() as connection:
-            rows = connection.execute(
-                text(
-                    """
+            rows = raw_fetchall(
+                connection,
+                """
                     SELECT
                         c.locationID AS "locationID",
                         c.locationName AS "locationName",
                         c.locationType AS "locationType",
-                        c.coordinate AS "coordinate",
-                        info.isPublic AS "isPublic",
-                        c.maxCapacity AS "maxCapacity",
-                        c.parkingSpaces AS "parkingSpaces",
+                        c.coordinate[0] AS "x",
+                        c.coordinate[1] AS "y",
+                        COALESCE(info.isPublic, FALSE) AS "isPublic",
+                        COALESCE(c.maxCapacity, 0)::int AS "maxCapacity",
+                        COALESCE(c.parkingSpaces, 0)::int AS "parkingSpaces",
                         COALESCE(u.username, 'Unknown') AS "owner"
                     FROM CELL c
                     JOIN CELL_TYPE_INFO info ON info.locationType = c.locationType
                     LEFT JOIN USERS u ON u.userID = c.createdBy
                     ORDER BY c.locationID
-                    """
-                )
-            ).mappings().all()
+                """,
+            )
 
-        payload = []
-        for row in rows:
-            payload.append({
-                "locationID": row["locationID"],
-                "locationName": row["locationName"],
-                "locationType": row["locationType"],
-                "coordinate": point_to_pair(row["coordinate"]),
-                "isPublic": bool(row["isPublic"]),
-                "maxCapacity": int(row["maxCapacity"] or 0),
-                "parkingSpaces": int(row["parkingSpaces"] or 0),
-                "owner": row["owner"],
-            })
+        #values arrive already typed from SQL, no per-field conversion needed
+        #a NULL coordinate gives NULL x and y, kept as "coordinate": null like point_to_pair(None)
+        payload = [
+            {
+                "locationID": location_id,
+                "locationName": name,
+                "locationType": location_type,
+                "coordinate": None if x is None else [x, y],
+                "isPublic": is_public,
+                "maxCapacity": capacity,
+                "parkingSpaces": parking,
+                "owner": owner,
+            }
+            for location_id, name, location_type, x, y, is_public, capacity, parking, owner in rows
+        ]
 
         return jsonify(payload), 200
     except SQLAlchemyError as exc:
@@ -2223,9 +2566,9 @@ def admin_all_locations():
 def admin_all_routes():
     try:
         with get_db_connection() as connection:
-            rows = connection.execute(
-                text(
-                    """
+            rows = raw_fetchall(
+                connection,
+                """
                     SELECT
                         tr.routeID AS "routeID",
                         tr.startCellCoord AS "startCellCoord",
@@ -2240,22 +2583,22 @@ def admin_all_routes():
                     LEFT JOIN USERS u ON u.userID = v.ownedBy
                     LEFT JOIN MODE_OF_TRANSPORT mot ON mot.transportID = tr.modeOfTransportID
                     ORDER BY tr.routeID DESC
-                    """
-                )
-            ).mappings().all()
+                """,
+            )
 
-        payload = []
-        for row in rows:
-            payload.append({
-                "routeID": row["routeID"],
-                "owner": row["owner"],
-                "transportType": row["transportType"],
-                "startCellCoord": point_to_pair(row["startCellCoord"]),
-                "endCellCoord": point_to_pair(row["endCellCoord"]),
-                "totalDistance": row["totalDistance"],
-                "totalTime": row["travelTime"],
-                "totalCost": row["totalCost"],
-            })
+        payload = [
+            {
+                "routeID": route_id,
+                "owner": owner,
+                "transportType": transport_type,
+                "startCellCoord": point_to_pair(start_coord),
+                "endCellCoord": point_to_pair(end_coord),
+                "totalDistance": total_distance,
+                "totalTime": travel_time,
+                "totalCost": total_cost,
+            }
+            for route_id, start_coord, end_coord, travel_time, total_distance, total_cost, transport_type, owner in rows
+        ]
 
         return jsonify(payload), 200
     except SQLAlchemyError as exc:
@@ -2263,35 +2606,22 @@ def admin_all_routes():
         return jsonify({"message": "Unable to load routes"}), 500
 
 
+"""
+Delete a road in a single statement
+TIME_RESTRICTION (and through it RESTRICTEDTRANSPORT) and ACCESSIBLE_BY already cascade from ROAD
+CONNECTS_TO is cleared in the same statement because databases configured before its foreign key cascaded still reject the delete
+"""
 def delete_road_record(connection, road_id: int) -> bool:
-    restriction_names = connection.execute(
+    result = connection.execute(
         text(
             """
-            SELECT restrictionName AS "name"
-            FROM TIME_RESTRICTION
-            WHERE roadID = :rid
+            WITH unlinked AS (
+                DELETE FROM CONNECTS_TO WHERE roadID = :rid
+            )
+            DELETE FROM ROAD WHERE roadID = :rid
             """
         ),
         {"rid": road_id},
-    ).scalars().all()
-
-    for name in restriction_names:
-        connection.execute(
-            text("DELETE FROM RESTRICTEDTRANSPORT WHERE restrictionName = :name"),
-            {"name": name},
-        )
-
-    connection.execute(
-        text("DELETE FROM TIME_RESTRICTION WHERE roadID = :rid"),
-        {"rid": road_id},
-    )
-    connection.execute(
-        text("DELETE FROM CONNECTS_TO WHERE roadID = :rid"),
-        {"rid": road_id},
-    )
-    result = connection.execute(
-        text("DELETE FROM ROAD WHERE roadID = :rid"),
-        {"rid": road_id},
     )
     return result.rowcount > 0
 
@@ -2301,15 +2631,15 @@ def delete_road_record(connection, road_id: int) -> bool:
 def admin_delete_location(location_id):
     try:
         with db_engine.begin() as connection:
+            #delete the location up front, the returned row drives the cleanup of its routes and roads
             row = connection.execute(
                 text(
                     """
-                    SELECT locationID AS "locationID",
-                           coordinate AS "coordinate",
-                           createdBy AS "createdBy"
-                    FROM CELL
+                    DELETE FROM CELL
                     WHERE locationID = :lid
-                    FOR UPDATE
+                    RETURNING locationID AS "locationID",
+                              coordinate AS "coordinate",
+                              createdBy AS "createdBy"
                     """
                 ),
                 {"lid": location_id},
@@ -2320,6 +2650,7 @@ def admin_delete_location(location_id):
 
             removed_routes, pruned_roads = delete_location_entry(connection, row)
 
+        bump_road_version()
         return jsonify({
             "success": True,
             "removedRoutes": removed_routes,
@@ -2352,8 +2683,13 @@ def admin_delete_route(route_id):
 @webApp.route("/admin/roads", methods=["GET"])
 @require_auth(required_role="admin")
 def admin_all_roads():
+    #clients that ask for octet-stream get the ROAD table as PostgreSQL binary COPY, no per-row work on the server
+    wants_binary = request.accept_mimetypes.best_match(["application/json", "application/octet-stream"]) == "application/octet-stream"
     try:
         with get_db_connection() as connection:
+            if wants_binary:
+                payload = raw_copy_out(connection, ADMIN_ROADS_COPY)
+                return Response(payload, mimetype="application/octet-stream"), 200
             roads = fetch_roads(connection)
         return jsonify(roads), 200
     except SQLAlchemyError as exc:
@@ -2371,6 +2707,7 @@ def admin_delete_road(road_id):
         if not deleted:
             return jsonify({"message": "Road not found"}), 404
 
+        bump_road_version()
         return jsonify({"success": True}), 200
     except SQLAlchemyError as exc:
         print("Error deleting admin road", exc)
@@ -2391,6 +2728,7 @@ def admin_delete_user(target_id):
         if not deleted:
             return jsonify({"message": "User not found"}), 404
 
+        bump_road_version()
         return jsonify({"success": True}), 200
     except SQLAlchemyError as exc:
         print("Error deleting user", exc)
@@ -2400,18 +2738,18 @@ def admin_delete_user(target_id):
 @webApp.route("/admin/activity", methods=["GET"])
 @require_auth(required_role="admin")
 def get_admin_activity():
-    now = datetime.utcnow()
+    now = datetime.now(_UTC)
     events = [
         {
             "id": f"sync-{int(now.timestamp())}",
-            "timestamp": now.isoformat() + "Z",
+            "timestamp": now,
             "type": "sync",
             "severity": "info",
             "summary": "System sync completed successfully.",
         },
         {
             "id": f"roads-{int(now.timestamp())}",
-            "timestamp": now.isoformat() + "Z",
+            "timestamp": now,
             "type": "mutation",
             "severity": "warn",
             "summary": "Monitoring blocked road segments for congestion.",
@@ -2443,47 +2781,180 @@ def normalize_coord(coord):
 
 
 """
-Function to build the road 
+Build the road graph as per-node adjacency tuples with integer node IDs
+Node i sits at coords[i] and neighbors[i] holds its (neighbor, weight) pairs
+xs and ys hold the same coordinates split into two flat float lists for the search kernel
+landmarks[i] holds node i's road distance to each ALT landmark; it starts as None and is filled in later by attach_landmarks
+coord_to_id maps a normalized (x, y) coordinate back to its node ID
+Segment endpoints come back from SQL as plain floats, so no LSEG text is parsed per row
 """
 def build_road_graph(connection_to_db, owner_id: Optional[int] = None):
-    adjacency = defaultdict(list)
-
     base_query = """
-        SELECT r.roadID, r.roadSegment, r.roadName, r.distance, r.roadType
+        SELECT (r.roadSegment[0])[0], (r.roadSegment[0])[1],
+               (r.roadSegment[1])[0], (r.roadSegment[1])[1],
+               r.distance
         FROM ROAD r
+        WHERE r.roadType IS DISTINCT FROM 'blocked'
+          AND r.roadSegment IS NOT NULL
     """
 
     params: dict[str, object] = {}
     if owner_id is not None:
         base_query += """
-        WHERE EXISTS (
+          AND EXISTS (
             SELECT 1
             FROM CONNECTS_TO ct
             JOIN CELL c ON c.locationID = ct.locationID
             WHERE ct.roadID = r.roadID
-              AND c.createdBy = :owner_id
+              AND c.createdBy = %(owner_id)s
         )
         """
         params["owner_id"] = owner_id
 
-    db_output = connection_to_db.execute(text(base_query), params)
-    rows = db_output.fetchall()
+    rows = raw_fetchall(connection_to_db, base_query, params)
+
+    #first pass: number the endpoints and keep each road as (source, target, weight) columns
+    #parallel roads between the same two nodes collapse to the cheapest, keyed by min_id << 32 | max_id
+    coord_to_id = {}
+    node_of = coord_to_id.setdefault
+    edge_slot = {}
+    sources = []
+    targets = []
+    edge_weights = []
+    for x1, y1, x2, y2, distance in rows:
+        source = node_of((x1, y1), len(coord_to_id))
+        target = node_of((x2, y2), len(coord_to_id))
+        if source == target:
+            continue  # zero-length segment, never part of a shortest path
+        key = (source << 32) | target if source < target else (target << 32) | source
+        weight = float(distance)
+
+        slot = edge_slot.get(key)
+        if slot is None:
+            edge_slot[key] = len(sources)
+            sources.append(source)
+            targets.append(target)
+            edge_weights.append(weight)
+        elif weight < edge_weights[slot]:
+            edge_weights[slot] = weight
+
+    #second pass: both directions of every road into per-node lists, frozen to tuples so the search loop iterates them directly
+    adjacency = [[] for _ in range(len(coord_to_id))]
+    for source, target, weight in zip(sources, targets, edge_weights):
+        adjacency[source].append((target, weight))
+        adjacency[target].append((source, weight))
+    neighbors = [tuple(edges) for edges in adjacency]
+
+    coords = list(coord_to_id)
+    return {
+        "coord_to_id": coord_to_id,
+        "coords": coords,
+        "xs": [x for x, _ in coords],
+        "ys": [y for _, y in coords],
+        "neighbors": neighbors,
+        "landmarks": None,  # until attach_landmarks has run, the search uses the straight-line heuristic alone
+        "path_cache": OrderedDict(),  # (start_id, goal_id) -> (path_ids, cost), see cached_segment_path
+        "workspace": threading.local(),  # per-thread search arrays, see search_workspace
+    }
+
+ALT_LANDMARK_COUNT = 8  # landmarks per graph for the ALT heuristic
+ALT_MIN_NODES = 2000  # below this the straight-line heuristic searches fast enough that 8 full Dijkstra passes never pay off
 
-    for roadID, roadSegment, roadName, distance, roadType in rows:
-        if roadType == "blocked":
-            continue  # skip blocked roads so pathfinding avoids closed segments
-        if not roadSegment or len(roadSegment) != 2:  # roadSegment expected to be [(x1, y1), (x2, y2)]
+"""
+Road distance from source to every node (Dijkstra), unreachable nodes get 0.0
+0.0 keeps the ALT bound admissible: it only differs between nodes in different components, which have no path anyway
+"""
+def road_distances_from(neighbors, source: int):
+    infinity = float("inf")
+    distances = [infinity] * len(neighbors)
+    distances[source] = 0.0
+    open_set = [(0.0, source)]
+    while open_set:
+        distance, node = heapq.heappop(open_set)
+        if distance > distances[node]:
             continue
+        for neighbor, weight in neighbors[node]:
+            candidate = distance + weight
+            if candidate < distances[neighbor]:
+                distances[neighbor] = candidate
+                heapq.heappush(open_set, (candidate, neighbor))
+    return [0.0 if distance == infinity else distance for distance in distances]
+
+"""
+Precompute ALT landmark distances for a road graph
+Landmarks are picked farthest-first: each new one is the node farthest from all landmarks chosen so far
+By the triangle inequality |d(L, u) - d(L, t)| never overestimates d(u, t), so the best landmark tightens A* without losing optimality
+Returns one tuple per node with its distance to every landmark, or None when the graph is too small to need it
+"""
+def build_landmark_table(neighbors):
+    node_count = len(neighbors)
+    if node_count < ALT_MIN_NODES:
+        return None
 
-        p1 = normalize_coord(roadSegment[0])
-        p2 = normalize_coord(roadSegment[1])
-        weight = float(distance)
+    columns = []
+    nearest = [float("inf")] * node_count  # distance from each node to its closest landmark so far
+    landmark = 0
+    for _ in range(ALT_LANDMARK_COUNT):
+        distances = road_distances_from(neighbors, landmark)
+        columns.append(distances)
+        for node_id in range(node_count):
+            if distances[node_id] < nearest[node_id] and (distances[node_id] > 0.0 or node_id == landmark):
+                nearest[node_id] = distances[node_id]
+        landmark = max(range(node_count), key=nearest.__getitem__)  # unreached components count as farthest
+        if nearest[landmark] == 0.0:
+            break  # every node is already a landmark
+
+    return list(zip(*columns))
 
-        # undirected edge
-        adjacency[p1].append((p2, weight))
-        adjacency[p2].append((p1, weight))
+_LANDMARK_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="alt-landmarks")
 
-    return adjacency
+"""
+Fill in graph["landmarks"] off the request path, submitted to _LANDMARK_EXECUTOR when a large graph is cached
+Searches that start before it finishes just use the straight-line heuristic; both are admissible, so cached paths stay optimal
+Skipped when the road version has already moved on and the graph is no longer cached
+"""
+def attach_landmarks(owner_id: Optional[int], graph):
+    with _ROAD_GRAPH_LOCK:
+        if _ROAD_GRAPH_CACHE["graphs"].get(owner_id) is not graph:
+            return
+    graph["landmarks"] = build_landmark_table(graph["neighbors"])
+
+"""
+Process-wide cache of road graphs, one per owner, all built at the same road version
+Readers compare the cached version with road_version_seq and rebuild only on mismatch
+"""
+_ROAD_GRAPH_CACHE = {"version": None, "graphs": {}}
+_ROAD_GRAPH_LOCK = threading.Lock()
+ROAD_GRAPH_CACHE_LIMIT = 256  # owners kept per version before the cache is emptied
+PATH_CACHE_LIMIT = 4096  # segment results kept per road graph, least recently used evicted first
+_PATH_CACHE_LOCK = threading.Lock()
+
+"""
+Return the road graph for an owner, rebuilding it only when the road version has moved on
+The cached graph is shared between requests and must be treated as read-only
+"""
+def load_road_graph(connection_to_db, owner_id: Optional[int] = None):
+    version = current_road_version(connection_to_db)
+    with _ROAD_GRAPH_LOCK:
+        if _ROAD_GRAPH_CACHE["version"] == version and owner_id in _ROAD_GRAPH_CACHE["graphs"]:
+            return _ROAD_GRAPH_CACHE["graphs"][owner_id]
+
+    graph = build_road_graph(connection_to_db, owner_id)  # built outside the lock so other owners are not blocked
+
+    with _ROAD_GRAPH_LOCK:
+        cached_version = _ROAD_GRAPH_CACHE["version"]
+        if cached_version is None or cached_version < version:
+            _ROAD_GRAPH_CACHE["version"] = version
+            _ROAD_GRAPH_CACHE["graphs"] = {}
+        if cached_version is None or cached_version <= version:  # never store a graph older than the cache
+            graphs = _ROAD_GRAPH_CACHE["graphs"]
+            if len(graphs) >= ROAD_GRAPH_CACHE_LIMIT:
+                graphs.clear()
+            graphs[owner_id] = graph
+            if len(graph["neighbors"]) >= ALT_MIN_NODES:
+                _LANDMARK_EXECUTOR.submit(attach_landmarks, owner_id, graph)
+
+    return graph
 
 """
 The heuristic used in A* pathfinding is Chebyshev 
@@ -2495,77 +2966,202 @@ def heuristic(a, b):
     return max(abs(ax - bx), abs(ay - by))
 
 """
-Actual A* pathfinding code using the start and end goal 
-"""
-def a_star(start, goal, adjacency):
-    start = normalize_coord(start)
-    goal = normalize_coord(goal)
-
-    open_set = []
-    heapq.heappush(open_set, (0.0, start))
-    came_from = {}
-    g_score = {start: 0.0}
-
-    while open_set:
-        current_f, current = heapq.heappop(open_set)
-        if current == goal:  # reconstruct path
-            path = [current]
-            while current in came_from:
-                current = came_from[current]
-                path.append(current)
-
-            path.reverse()
-            return path, g_score[goal]
-
-        # if stale entry then we skip because found better path
-        if current_f > g_score.get(current, float("inf")) + heuristic(current, goal):
-            continue
-
-        for neighbor, weight in adjacency.get(current, []):
-            tentative_g = g_score[current] + float(weight)
-
-            if tentative_g < g_score.get(neighbor, float("inf")):
-                came_from[neighbor] = current
-                g_score[neighbor] = tentative_g
-                f_score = tentative_g + heuristic(neighbor, goal)
-                heapq.heappush(open_set, (f_score, neighbor))
+Per-thread scratch arrays for searches on one graph: g scores, closed flags, parents and heuristics, one list of each per search side
+Allocated on the thread's first search, every search leaves g, closed and parents reset so the next one can start without an O(nodes) allocation
+A heuristic entry is only read for nodes the current search has labelled, so those lists never need resetting
+"""
+def search_workspace(graph):
+    local = graph["workspace"]
+    arrays = getattr(local, "arrays", None)
+    if arrays is None:
+        node_count = len(graph["neighbors"])
+        infinity = float("inf")
+        arrays = local.arrays = (
+            ([infinity] * node_count, [infinity] * node_count),
+            ([False] * node_count, [False] * node_count),
+            ([-1] * node_count, [-1] * node_count),
+            ([0.0] * node_count, [0.0] * node_count),
+        )
+    return arrays
+
+"""
+Bidirectional A* search over the road graph using integer node IDs
+Side 0 searches forward from start towards goal, side 1 backward from goal towards start; roads are undirected so the adjacency is its own reverse
+Each step expands the side whose queue has the smaller top f, and best_cost tracks the cheapest start -> meeting -> goal path seen so far
+The search stops once either queue's smallest f reaches best_cost, no unexplored path can then beat it (Pohl's criterion, valid for admissible heuristics)
+Returns the list of node IDs from start to goal and its cost, or (None, None) when the goal is unreachable
+"""
+def _bidirectional_a_star(start_id: int, goal_id: int, graph):
+    xs = graph["xs"]
+    ys = graph["ys"]
+    neighbors = graph["neighbors"]
+    infinity = float("inf")
+    heappush = heapq.heappush  # bound once, the C heap beats any heap written in Python
+    heappop = heapq.heappop
+
+    #dense per-node arrays reused from the thread's workspace, -1 marks a node with no parent
+    g_scores, closed_sets, came_from, h_scores = search_workspace(graph)
+    touched = ([start_id], [goal_id])  # nodes each side has labelled, reset on the way out
+    open_sets = ([(0.0, start_id)], [(0.0, goal_id)])
+    g_scores[0][start_id] = 0.0
+    g_scores[1][goal_id] = 0.0
+    targets = ((xs[goal_id], ys[goal_id]), (xs[start_id], ys[start_id]))  # each side heads for the other side's root
+    landmark_rows = graph["landmarks"]
+    target_landmarks = (None, None) if landmark_rows is None else (landmark_rows[goal_id], landmark_rows[start_id])
+
+    best_cost = infinity
+    meeting = None
 
-    return None, None  # no valid path
+    try:
+        while open_sets[0] and open_sets[1]:
+            forward_f = open_sets[0][0][0]
+            backward_f = open_sets[1][0][0]
+            if max(forward_f, backward_f) >= best_cost:
+                break
+
+            side = 0 if forward_f <= backward_f else 1
+            open_set = open_sets[side]
+            g_score = g_scores[side]
+            closed = closed_sets[side]
+            other_g = g_scores[1 - side]
+            parents = came_from[side]
+            h_score = h_scores[side]
+            visited = touched[side]
+            target_x, target_y = targets[side]
+            target_row = target_landmarks[side]
+
+            current = heappop(open_set)[1]
+
+            # each node is expanded once per side, later (stale) queue entries for it are skipped
+            if closed[current]:
+                continue
+            closed[current] = True
+            current_g = g_score[current]
+
+            for neighbor, weight in neighbors[current]:
+                if closed[neighbor]:
+                    continue
+                tentative_g = current_g + weight
+
+                previous_g = g_score[neighbor]
+                if tentative_g < previous_g:
+                    if previous_g == infinity:  # first label this search, compute the heuristic once and keep it
+                        visited.append(neighbor)
+                        h = max(abs(xs[neighbor] - target_x), abs(ys[neighbor] - target_y))
+                        if target_row is not None:  # ALT bound, keep whichever estimate is tighter
+                            h = max(h, max(map(abs, map(sub, landmark_rows[neighbor], target_row))))
+                        h_score[neighbor] = h
+                    else:
+                        h = h_score[neighbor]
+                    parents[neighbor] = current
+                    g_score[neighbor] = tentative_g
+                    heappush(open_set, (tentative_g + h, neighbor))
+
+                    # the other side has reached this node too, so there is a full path through it (inf otherwise)
+                    if tentative_g + other_g[neighbor] < best_cost:
+                        best_cost = tentative_g + other_g[neighbor]
+                        meeting = neighbor
+
+        if meeting is None:
+            return None, None  # no valid path
+
+        # splice start -> meeting (forward parents) with meeting -> goal (backward parents)
+        # count both halves first so the path is allocated once and filled in place, no appends or reverse
+        forward_parents, backward_parents = came_from
+        forward_length = 0
+        node = forward_parents[meeting]
+        while node != -1:
+            forward_length += 1
+            node = forward_parents[node]
+        backward_length = 0
+        node = backward_parents[meeting]
+        while node != -1:
+            backward_length += 1
+            node = backward_parents[node]
+
+        path = [0] * (forward_length + 1 + backward_length)
+        node = meeting
+        for index in range(forward_length, -1, -1):
+            path[index] = node
+            node = forward_parents[node]
+        node = meeting
+        for index in range(forward_length, len(path)):
+            path[index] = node
+            node = backward_parents[node]
+
+        return path, best_cost
+    finally:
+        for side in (0, 1):
+            g_score = g_scores[side]
+            closed = closed_sets[side]
+            parents = came_from[side]
+            for node in touched[side]:
+                g_score[node] = infinity
+                closed[node] = False
+                parents[node] = -1
+
+"""
+Memoized segment search on one road graph
+Roads are undirected, so a result is also stored for the reversed query
+Cached paths are shared and must not be modified by callers
+"""
+def cached_segment_path(start_id: int, goal_id: int, graph):
+    cache = graph["path_cache"]
+    key = (start_id, goal_id)
+    with _PATH_CACHE_LOCK:
+        hit = cache.get(key)
+        if hit is not None:
+            cache.move_to_end(key)
+            return hit
+
+    result = _bidirectional_a_star(start_id, goal_id, graph)  # searched outside the lock
+    path_ids, cost = result
+    reverse = (path_ids[::-1], cost) if path_ids is not None else result
+
+    with _PATH_CACHE_LOCK:
+        cache[key] = result
+        cache[(goal_id, start_id)] = reverse
+        while len(cache) > PATH_CACHE_LIMIT:
+            cache.popitem(last=False)
+
+    return result
 
 """
 Helper function as part of A* pathfinding
 Grab the necessary information given by the front end (see message above for all various information needed)
-Do an A* search using the information given
+Every stop is normalized and mapped to its node ID once, then each leg is searched on IDs
 Format resulting path in a nice and easy to utilize way 
 Return full path and cost 
 """
-def aStarSearch(user_id, start, end, pitstops, adjacency):
-    current = normalize_coord(start)
-    final_goal = normalize_coord(end)
-    pitstops = [normalize_coord(p) for p in (pitstops or [])]
+def aStarSearch(user_id, start, end, pitstops, graph):
+    stops = [normalize_coord(start)] + [normalize_coord(p) for p in (pitstops or [])] + [normalize_coord(end)]
+    coord_to_id = graph["coord_to_id"]
+    stop_ids = [coord_to_id.get(stop) for stop in stops]  # None when the stop is not on the road network
+    coords = graph["coords"]
 
-    full_path = []
+    full_path = [stops[0]]
     total_cost = 0.0
 
-    targets = pitstops + [final_goal]
+    for leg in range(len(stops) - 1):
+        current, target = stops[leg], stops[leg + 1]
+        current_id, target_id = stop_ids[leg], stop_ids[leg + 1]
 
-    for target in targets:
-        segment_path, segment_cost = a_star(current, target, adjacency)
-        if segment_path is None:
-            # Fallback: draw a direct segment if the road graph lacks a path
-            direct_distance = heuristic(current, target)
-            segment_path = [current, target]
-            segment_cost = direct_distance
+        if current == target:
+            continue  # zero-length leg, the junction point is already on the path
 
-        # when chaining segments avoid duplicating junction point
-        if full_path:
-            full_path.extend(segment_path[1:])
+        path_ids = None
+        if current_id is not None and target_id is not None:
+            path_ids, segment_cost = cached_segment_path(current_id, target_id, graph)
 
-        else:
-            full_path.extend(segment_path)
+        if path_ids is None:
+            # Fallback: draw a direct segment if the road graph lacks a path
+            full_path.append(target)
+            total_cost += heuristic(current, target)
+            continue
 
+        # when chaining segments avoid duplicating junction point
+        full_path.extend(coords[node_id] for node_id in path_ids[1:])
         total_cost += segment_cost
-        current = target
 
     return full_path, total_cost
 #---------------------------
\ No newline at end of file
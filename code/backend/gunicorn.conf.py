@@ -0,0 +1,21 @@
+"""
+Gunicorn settings for the back-end, read automatically when gunicorn is started from code/backend (e.g. gunicorn backend:webApp)
+Pathfinding is pure Python, so threads inside one process share the GIL and cannot run two A* searches at once.
+Independent users are spread over several worker processes instead, each with its own road graph cache.
+Threads are still useful inside a worker because database waits release the GIL.
+Every worker holds its own SQLAlchemy pool (up to 15 connections), so raise WEB_CONCURRENCY only as far as Postgres max_connections allows.
+"""
+import os
+
+workers = int(os.environ.get("WEB_CONCURRENCY", 2)) # cpu_count() reports the host's cores inside containers, so default low
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+preload_app = True # import backend once in the master so the schema bootstrap runs once instead of racing in every worker
+
+
+"""
+The master's bootstrap connections must not be shared across fork
+dispose(close=False) gives the worker a fresh pool and leaves the parent's sockets alone
+"""
+def post_fork(server, worker):
+    from backend import db_engine
+    db_engine.dispose(close=False)
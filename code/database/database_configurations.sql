@@ -101,7 +101,7 @@ CREATE TABLE ROAD(
 --CONNECTS_TO table (CELL CONNECTS_TO ROAD relationship)--
 CREATE TABLE CONNECTS_TO(
    roadID INTEGER,
-   FOREIGN KEY (roadID) REFERENCES ROAD(roadID),
+   FOREIGN KEY (roadID) REFERENCES ROAD(roadID) ON DELETE CASCADE, --If referenced road is deleted, delete this tuple too
    locationID INTEGER,
    FOREIGN KEY (locationID) REFERENCES CELL(locationID) ON DELETE CASCADE,
    PRIMARY KEY (roadID, locationID)
@@ -181,4 +181,45 @@ CREATE TABLE TRAVEL_ROUTE(
    totalDistance TEXT NOT NULL,
    totalCost TEXT NOT NULL
 );
-----------------------
\ No newline at end of file
+----------------------
+
+--Secondary indexes for owner lookups and joins (USERS.username and USERS.email are already indexed by UNIQUE)--
+CREATE INDEX cell_createdby_idx ON CELL(createdBy);
+CREATE INDEX connects_to_location_idx ON CONNECTS_TO(locationID);
+CREATE INDEX vehicle_ownedby_idx ON VEHICLE(ownedBy);
+CREATE INDEX travel_route_vehicle_idx ON TRAVEL_ROUTE(vehicleID);
+CREATE INDEX road_blocked_idx ON ROAD(roadID) WHERE roadType = 'blocked'; --partial index, only blocked roads
+CREATE INDEX cell_coordinate_gix ON CELL USING GIST(coordinate); --R-tree over points, serves ~= and <-> (nearest neighbour)
+CREATE INDEX travel_route_start_gix ON TRAVEL_ROUTE USING GIST(startCellCoord);
+CREATE INDEX travel_route_end_gix ON TRAVEL_ROUTE USING GIST(endCellCoord);
+CREATE UNIQUE INDEX travel_route_dedupe_idx ON TRAVEL_ROUTE( --a vehicle cannot store the same route twice, saveRoute skips duplicates against this
+   vehicleID, modeOfTransportID,
+   (startCellCoord[0]), (startCellCoord[1]), (endCellCoord[0]), (endCellCoord[1]),
+   travelTime, totalDistance, totalCost
+);
+-------------------------------------------------------------------------------------------------------------------
+
+--Road graph version, advanced by the backend after every committed change to ROAD or CONNECTS_TO--
+CREATE SEQUENCE road_version_seq;
+------------------------------------------------------------------------------------------------
+
+--Admin dashboard totals, refreshed by the backend with REFRESH MATERIALIZED VIEW CONCURRENTLY once older than a minute--
+CREATE MATERIALIZED VIEW admin_totals AS
+    SELECT
+        1 AS totals_key,
+        (SELECT COUNT(*) FROM USERS) AS total_users,
+        cells.total_locations,
+        (SELECT COUNT(*) FROM TRAVEL_ROUTE) AS total_routes,
+        (SELECT COUNT(*) FROM ROAD WHERE roadType = 'blocked') AS blocked_roads,
+        cells.pending_requests,
+        now() AS refreshed_at
+    FROM (
+        -- one pass over CELL for both location counts
+        SELECT
+            COUNT(*) AS total_locations,
+            COUNT(*) FILTER (WHERE NOT info.isPublic) AS pending_requests
+        FROM CELL c
+        LEFT JOIN CELL_TYPE_INFO info ON info.locationType = c.locationType
+    ) cells;
+CREATE UNIQUE INDEX admin_totals_key_idx ON admin_totals(totals_key); --required for concurrent refresh
+------------------------------------------------------------------------------------------------
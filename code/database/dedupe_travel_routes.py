@@ -0,0 +1,72 @@
+"""
+One-off clean up for databases that stored the same route more than once before travel_route_dedupe_idx existed.
+Keeps the oldest route of every duplicate group, deletes the rest, then creates the unique index the back-end expects.
+Requires the local system running the file to have psycopg2 and sqlalchemy
+-> python -m venv my_venv
+-> my_venv \ Scripts\ activate (no spaces)
+-> pip install sqlalchemy
+-> pip install psycopg2
+-> set DATABASE_URL
+-> python dedupe_travel_routes.py
+"""
+"""
+Uses SQLAlchemy to connect to the database
+Everything runs in one transaction, nothing is deleted unless the index is created as well
+"""
+import os
+import sys
+from sqlalchemy import create_engine, text
+
+#--Set up and connect to DB--
+DATABASE_URL = os.environ.get("DATABASE_URL") or "INSERT DATABASE URL"
+if DATABASE_URL == "INSERT DATABASE URL":
+    print("DATABASE_URL environment variable is not set. Export it or edit dedupe_travel_routes.py with your connection string.")
+    sys.exit(1)
+db_engine = create_engine(DATABASE_URL)
+#----------------------------
+
+"""
+Routes that repeat an older route of the same vehicle column for column, travel_route_dedupe_idx's key
+"""
+DUPLICATE_ROUTES = """
+    SELECT newer.routeID, older.routeID AS keptRouteID
+    FROM TRAVEL_ROUTE newer
+    JOIN TRAVEL_ROUTE older
+      ON older.routeID < newer.routeID
+     AND older.vehicleID = newer.vehicleID
+     AND older.modeOfTransportID = newer.modeOfTransportID
+     AND older.startCellCoord[0] = newer.startCellCoord[0]
+     AND older.startCellCoord[1] = newer.startCellCoord[1]
+     AND older.endCellCoord[0] = newer.endCellCoord[0]
+     AND older.endCellCoord[1] = newer.endCellCoord[1]
+     AND older.travelTime = newer.travelTime
+     AND older.totalDistance = newer.totalDistance
+     AND older.totalCost = newer.totalCost
+"""
+
+with db_engine.begin() as connection:
+    duplicates = connection.execute(
+        text(f"SELECT routeID, MIN(keptRouteID) FROM ({DUPLICATE_ROUTES}) d GROUP BY routeID ORDER BY routeID")
+    ).all()
+    for route_id, kept_route_id in duplicates:
+        print(f"route {route_id} duplicates route {kept_route_id}")
+    if duplicates and input(f"Delete {len(duplicates)} duplicate routes? (y/n) ").strip().lower() != "y":
+        print("Nothing deleted")
+        sys.exit(0)
+
+    deleted = connection.execute(
+        text(f"DELETE FROM TRAVEL_ROUTE WHERE routeID IN (SELECT routeID FROM ({DUPLICATE_ROUTES}) d)")
+    ).rowcount
+    connection.execute(
+        text(
+            """
+            CREATE UNIQUE INDEX IF NOT EXISTS travel_route_dedupe_idx ON TRAVEL_ROUTE(
+                vehicleID, modeOfTransportID,
+                (startCellCoord[0]), (startCellCoord[1]), (endCellCoord[0]), (endCellCoord[1]),
+                travelTime, totalDistance, totalCost
+            )
+            """
+        )
+    )
+
+print(f"Deleted {deleted} duplicate routes, travel_route_dedupe_idx is in place")
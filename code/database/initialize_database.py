@@ -16,6 +16,7 @@ Imports create_engine as the main entry point into the DB
 Imports text to safely inject SQL code into the database
 """
 from sqlalchemy import create_engine, text
+from pathlib import Path
 
 #--Set up and connect to DB--
 DATABASE_URL = "INSERT DATABASE URL" # Placeholder for when running the file locally during database set up
@@ -23,7 +24,26 @@ db_engine = create_engine(DATABASE_URL)
 connection_to_db = db_engine.connect()
 #----------------------------
 
-connection_to_db.execute(text(open("database_configurations.sql", "r").read())) # Read the configurations file and send it as a command to the DB to execute
+"""
+Split the configurations file into single statements once, when this file loads
+A statement ends on a line whose code (ignoring a trailing --comment) ends with ;
+Chunks holding only comments or dividers are dropped
+"""
+def split_sql_statements(script):
+    statements = []
+    current = []
+    for line in script.splitlines():
+        current.append(line)
+        if line.split("--", 1)[0].rstrip().endswith(";"):
+            statements.append("\n".join(current))
+            current = []
+    statements.append("\n".join(current))
+    return [statement for statement in statements if any(line.split("--", 1)[0].strip() for line in statement.splitlines())]
+
+SCHEMA_STATEMENTS = split_sql_statements(Path(__file__).with_name("database_configurations.sql").read_bytes().decode("utf-8"))
+
+for statement in SCHEMA_STATEMENTS: # Send each statement straight to the driver, skipping SQLAlchemy's text() parsing
+    connection_to_db.exec_driver_sql(statement)
 
 print("Initialization Successful")
 
@@ -1,12 +1,13 @@
 """
 A simple file that takes input from the CLI and sends it to the PostgreSQL database.
-Requires the local system running the file to have psycopg2 and sqlalchemy
+Requires the local system running the file to have psycopg (version 3) and sqlalchemy
 -> python -m venv my_venv
 -> my_venv \ Scripts\ activate (no spaces)
 -> pip install sqlalchemy
--> pip install psycopg2
+-> pip install "psycopg[binary]"
 -> pip install tabulate
--> python interact_with_db_commits.py
+-> pip install sqlparse
+-> python interact_with_db_commits.py (or python interact_with_db_commits.py -f script.sql to run a whole file)
 Author: Jason Duong, Yahya Asmara
 """
 """
@@ -14,10 +15,13 @@ Uses SQLAlchemy to connect to the database
 Imports create_engine as the main entry point into the DB
 Imports text to safely inject SQL code into the database
 Imports tabulate to view output from the DB in a user-friendly format
+Imports sqlparse to split a script file into statements for batch mode
 """
 import os
 import sys
+import sqlparse
 from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
 from tabulate import tabulate
 
 #--Set up and connect to DB--
@@ -25,27 +29,66 @@ DATABASE_URL = os.environ.get("DATABASE_URL") or "INSERT DATABASE URL"
 if not DATABASE_URL or DATABASE_URL == "INSERT DATABASE URL":
     print("DATABASE_URL environment variable is not set. Export it or edit interact_with_db.py with your connection string.")
     sys.exit(1)
-db_engine = create_engine(DATABASE_URL)
+DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1).replace("postgresql://", "postgresql+psycopg://", 1) # run on the psycopg 3 driver
+db_engine = create_engine(DATABASE_URL, poolclass=NullPool) # the REPL holds a single connection, a pool has nothing to reuse
+
+"""
+Batch mode: python interact_with_db_commits.py -f script.sql
+Runs every statement in the file inside one transaction and exits, so scripted use skips the REPL entirely
+sqlparse does the splitting so a ; inside a string or comment does not end a statement
+"""
+if len(sys.argv) > 2 and sys.argv[1] == "-f":
+    with open(sys.argv[2], encoding="utf-8") as script:
+        batch = [statement for statement in sqlparse.split(script.read()) if statement.strip()]
+    try:
+        with db_engine.begin() as batch_connection:
+            for statement in batch:
+                batch_connection.exec_driver_sql(statement)
+    except Exception as exc:
+        print(f"Error running script, nothing was committed: {exc}")
+        sys.exit(1)
+    print(f"{len(batch)} statements run (committed)")
+    sys.exit(0)
+
+"""
+One connection for the whole session
+AUTOCOMMIT commits every statement as soon as it runs, so there is no BEGIN/COMMIT round-trip per command
+"""
+def open_connection():
+    return db_engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+
+connection = open_connection()
+statements = {} # SQL text -> TextClause, so repeated commands are not parsed again
+ROWS_PER_PAGE = 1000
 #----------------------------
 print("Connected. Type SQL statements to run them. Type exit to leave.")
 while True:
     userInput = input("sql> ").strip()
     if userInput.lower() == "exit":
+        connection.close()
         break
     if not userInput:
         continue
+    statement = statements.get(userInput)
+    if statement is None:
+        statement = statements[userInput] = text(userInput)
     try:
-        with db_engine.begin() as connection:
-            result = connection.execute(text(userInput))
-            try:
-                rows = result.mappings().all()
-                if rows:
-                    print(tabulate(rows, headers="keys", tablefmt="psql"))
-                else:
-                    print("(no rows)")
-            except Exception:
-                print("Command successful (committed)")
+        result = connection.execute(statement)
+        if result.returns_rows:
+            #print a table per page so only ROWS_PER_PAGE rows are converted and formatted at a time
+            headers = list(result.keys())
+            printed = False
+            for page in result.partitions(ROWS_PER_PAGE):
+                print(tabulate(page, headers=headers, tablefmt="psql"))
+                printed = True
+            if not printed:
+                print("(no rows)")
+        else:
+            print("Command successful (committed)")
     except Exception as exc:
         print(f"Error running command: {exc}")
+        if getattr(exc, "connection_invalidated", False): # server dropped the connection, reconnect for the next command
+            connection.close()
+            connection = open_connection()
 
 print("Goodbye")
\ No newline at end of file
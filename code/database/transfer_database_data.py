@@ -0,0 +1,140 @@
+"""
+Copies every row from one Orbis PostgreSQL database into another, e.g. when moving to a new Render instance.
+The target must already be configured with database_configurations.sql (run initialize_database.py first).
+Apart from the reference rows seeded by the schema file and the backend bootstrap, the target must hold no data.
+Requires the local system running the file to have psycopg2 and sqlalchemy
+-> python -m venv my_venv
+-> my_venv \ Scripts\ activate (no spaces)
+-> pip install sqlalchemy
+-> pip install psycopg2
+-> set SOURCE_DATABASE_URL and TARGET_DATABASE_URL
+-> python transfer_database_data.py
+"""
+"""
+Uses SQLAlchemy to create the engines, the copying itself goes through the raw psycopg2 connections
+Each table is streamed with COPY ... TO STDOUT on the source piped straight into COPY ... FROM STDIN on the target
+Binary format is used so no row is ever encoded to or decoded from text
+The whole transfer runs in one target transaction, so a failure part way leaves the target exactly as it was
+"""
+import os
+import sys
+import threading
+from sqlalchemy import create_engine
+
+#--Set up and connect to DB--
+SOURCE_DATABASE_URL = os.environ.get("SOURCE_DATABASE_URL") or "INSERT SOURCE DATABASE URL"
+TARGET_DATABASE_URL = os.environ.get("TARGET_DATABASE_URL") or "INSERT TARGET DATABASE URL"
+if SOURCE_DATABASE_URL.startswith("INSERT") or TARGET_DATABASE_URL.startswith("INSERT"):
+    print("SOURCE_DATABASE_URL and TARGET_DATABASE_URL environment variables must be set.")
+    sys.exit(1)
+source_engine = create_engine(SOURCE_DATABASE_URL)
+target_engine = create_engine(TARGET_DATABASE_URL)
+#----------------------------
+
+"""
+Tables in foreign key order, each table only references tables before it
+"""
+TABLES = [
+    "USERS", "CELL_TYPE_INFO", "CURRENCY", "ROAD", "MODE_OF_TRANSPORT", "VEHICLE_INFO",
+    "CELL", "EXCHANGES_TO", "TIME_RESTRICTION", "ACCESSIBLE_BY", "VEHICLE",
+    "LANDMARK", "ACCEPTS", "CONNECTS_TO", "RESTRICTEDTRANSPORT", "TRAVEL_ROUTE",
+]
+
+"""
+Reference tables that database_configurations.sql and the backend bootstrap fill on a fresh database
+They are emptied on the target before the copy, every other table has to be empty already
+"""
+SEEDED_TABLES = {"CELL_TYPE_INFO", "CURRENCY", "EXCHANGES_TO", "MODE_OF_TRANSPORT", "VEHICLE_INFO"}
+
+"""
+SERIAL columns whose sequences have to continue after the copied IDs
+"""
+SERIAL_COLUMNS = {
+    "USERS": "userID",
+    "CELL": "locationID",
+    "ROAD": "roadID",
+    "MODE_OF_TRANSPORT": "transportID",
+    "VEHICLE": "vehicleID",
+    "TRAVEL_ROUTE": "routeID",
+}
+
+
+"""
+Return the tables holding user data on the target, a transfer into them would mix two databases
+"""
+def non_empty_tables(target_cursor):
+    found = []
+    for table in TABLES:
+        if table in SEEDED_TABLES:
+            continue
+        target_cursor.execute(f"SELECT EXISTS (SELECT 1 FROM {table})")
+        if target_cursor.fetchone()[0]:
+            found.append(table)
+    return found
+
+
+"""
+Stream one table from the source cursor into the target cursor through an OS pipe
+Returns the number of rows written, nothing is committed here
+"""
+def copy_table(table, source_cursor, target_cursor):
+    read_fd, write_fd = os.pipe()
+    errors = []
+
+    def export():
+        try:
+            with os.fdopen(write_fd, "wb") as pipe_out:
+                source_cursor.copy_expert(f"COPY {table} TO STDOUT (FORMAT binary)", pipe_out)
+        except Exception as exc: # surfaced below, a failed export must not leave the import waiting
+            errors.append(exc)
+
+    exporter = threading.Thread(target=export)
+    exporter.start()
+    try:
+        with os.fdopen(read_fd, "rb") as pipe_in:
+            target_cursor.copy_expert(f"COPY {table} FROM STDIN (FORMAT binary)", pipe_in)
+    finally:
+        exporter.join()
+    if errors:
+        raise errors[0]
+    return target_cursor.rowcount
+
+
+"""
+Move every SERIAL sequence on the target past the highest copied ID and rebuild the admin totals
+"""
+def reset_sequences(target_cursor):
+    for table, column in SERIAL_COLUMNS.items():
+        target_cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence(%s, %s), COALESCE(MAX({column}), 1), MAX({column}) IS NOT NULL) FROM {table}",
+            (table.lower(), column.lower()),
+        )
+    target_cursor.execute("REFRESH MATERIALIZED VIEW admin_totals")
+
+
+source = source_engine.raw_connection()
+target = target_engine.raw_connection()
+try:
+    source.set_session(isolation_level="REPEATABLE READ", readonly=True) # every table is read from the same snapshot
+    source_cursor = source.cursor()
+    target_cursor = target.cursor()
+
+    occupied = non_empty_tables(target_cursor)
+    if occupied:
+        print("Target database already holds data in: " + ", ".join(occupied))
+        sys.exit(1)
+
+    target_cursor.execute("TRUNCATE " + ", ".join(TABLES)) # clears the seeded reference rows, the rest were checked empty above
+    for table in TABLES:
+        print(f"{table}: {copy_table(table, source_cursor, target_cursor)} rows")
+    reset_sequences(target_cursor)
+    target.commit()
+except Exception as exc:
+    target.rollback()
+    print(f"Transfer failed, target left unchanged: {exc}")
+    sys.exit(1)
+finally:
+    source.close()
+    target.close()
+
+print("Transfer Successful")
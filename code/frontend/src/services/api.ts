@@ -273,7 +273,7 @@ export const landmarkAPI = {
 // Route/Path API
 export const routeAPI = {
   async computePath(userId: number, params: ComputePathRequest): Promise<ComputePathResponse> {
-    return apiRequest(`/${userId}/computePath`, {
+    return apiRequest(`/${userId}/computePath?directions=1`, {
       method: 'POST',
       body: JSON.stringify(params),
     })